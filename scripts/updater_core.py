@@ -0,0 +1,1003 @@
+"""
+updater_core.py
+
+Shared implementation of the update scripts. Each *-Updatescript*.py
+subclasses one of the updaters below, fills in its repo / artifact
+settings and calls run():
+
+  ReleaseUpdater      - latest GitHub release, versioned by tag
+  NightlyUpdater      - nightly.link artifact of a branch, versioned by commit SHA
+  PullRequestUpdater  - artifact linked from a PR, versioned by download URL
+"""
+
+import os
+import errno
+import json
+import requests
+import platform
+import zipfile
+import io
+import mmap
+import struct
+import bisect
+import shutil
+import tempfile
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # ISA-L inflates and checksums considerably faster than zlib; extract
+    # through it when installed
+    from isal import isal_zlib
+    zipfile.zlib = isal_zlib
+    zipfile.crc32 = isal_zlib.crc32
+except ImportError:
+    pass
+
+PARALLEL_CHUNKS = 5
+SPOOL_MAX = 256 * 1024 * 1024
+TAIL_SIZE = 64 * 1024
+# Unwanted bytes between two wanted spans below this are downloaded anyway,
+# and no Range request is made for less than this
+RANGE_GAP = 4 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# Skip the online check if the last one was less than this many seconds ago;
+# 0 always checks
+try:
+    CHECK_INTERVAL_SEC = max(0, int(os.environ.get("HM64_CHECK_INTERVAL", 600)))
+except ValueError:
+    print("Ignoring HM64_CHECK_INTERVAL, not a whole number of seconds.")
+    CHECK_INTERVAL_SEC = 600
+
+
+# Characters Windows doesn't allow in file names, mapped like ZipFile.extract does
+WINDOWS_ILLEGAL = str.maketrans(':<>|"?*', "_______")
+
+
+class MemoryFile(io.RawIOBase):
+    """Seekable read-only file over a MemoryArchive; each reader gets its own position."""
+
+    def __init__(self, store):
+        super().__init__()
+        self._store = store
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._store.size
+        self._pos = offset
+        return offset
+
+    def readinto(self, b):
+        n = self._store.read_at(self._pos, b)
+        self._pos += n
+        return n
+
+
+def central_directory_offset(tail, tail_start):
+    """Offset of the zip's central directory, read from the EOCD record in tail."""
+    eocd = tail.rfind(b"PK\x05\x06")
+    if eocd < 0:
+        raise zipfile.BadZipFile("End of central directory record not found")
+    (offset,) = struct.unpack_from("<L", tail, eocd + 16)
+    if offset == 0xFFFFFFFF:
+        # Zip64: the locator just before the EOCD points at the zip64 EOCD record
+        (zip64_eocd,) = struct.unpack_from("<Q", tail, eocd - 12)
+        (offset,) = struct.unpack_from("<Q", tail, zip64_eocd - tail_start + 48)
+    return offset
+
+
+# errnos meaning the filesystem can't preallocate, rather than that it's full
+NO_PREALLOCATE = {errno.EOPNOTSUPP, errno.EINVAL, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)}
+
+
+def preallocate(f, size):
+    """
+    Reserve size bytes for f up front, so the filesystem can hand out
+    contiguous extents instead of growing the file write by write. Raises
+    OSError if the space isn't there (ENOSPC), before anything is downloaded.
+    """
+    fd = f.fileno()
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError as e:
+            if e.errno not in NO_PREALLOCATE:
+                raise
+    elif sys.platform == "darwin":
+        import fcntl
+
+        F_PREALLOCATE = getattr(fcntl, "F_PREALLOCATE", 42)
+        F_ALLOCATECONTIG, F_ALLOCATEALL, F_PEOFPOSMODE = 0x2, 0x4, 3
+        fstore = struct.pack("Iiqqq", F_ALLOCATECONTIG | F_ALLOCATEALL, F_PEOFPOSMODE, 0, size, 0)
+        try:
+            fcntl.fcntl(fd, F_PREALLOCATE, fstore)
+        except OSError:
+            # No contiguous run that big; any space will do
+            fstore = struct.pack("Iiqqq", F_ALLOCATEALL, F_PEOFPOSMODE, 0, size, 0)
+            try:
+                fcntl.fcntl(fd, F_PREALLOCATE, fstore)
+            except OSError as e:
+                if e.errno not in NO_PREALLOCATE:
+                    raise
+    # Sets the logical size; on Windows this is SetEndOfFile, which allocates
+    f.truncate(size)
+
+
+if hasattr(os, "pwrite"):
+
+    def write_at(fd, pos, data):
+        """Write data at pos in fd; threads can share fd as the offset is untouched."""
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, pos)
+            view = view[written:]
+            pos += written
+
+else:
+    _seek_lock = threading.Lock()
+
+    def write_at(fd, pos, data):
+        """Write data at pos in fd; no pwrite here, so seek + write under a lock."""
+        view = memoryview(data)
+        with _seek_lock:
+            os.lseek(fd, pos, os.SEEK_SET)
+            while view:
+                view = view[os.write(fd, view):]
+
+
+class MemoryArchive:
+    """
+    A size-byte archive downloaded into memory. Only the byte spans given,
+    (lo, hi) pairs, are held, each run of overlapping or adjacent ones in
+    its own bytearray; anything else reads as zeros.
+    """
+
+    def __init__(self, size, spans):
+        self.size = size
+        self._starts = []
+        self._parts = []
+        end = -1
+        for lo, hi in sorted(spans):
+            if self._parts and lo <= end + 1:
+                if hi > end:
+                    self._parts[-1].extend(bytes(hi - end))
+                    end = hi
+            else:
+                self._starts.append(lo)
+                self._parts.append(bytearray(hi - lo + 1))
+                end = hi
+
+    @classmethod
+    def of(cls, buf):
+        """Wrap a whole archive already in buf, without copying it."""
+        store = cls(len(buf), [])
+        store._starts, store._parts = [0], [buf]
+        return store
+
+    def _locate(self, pos, size):
+        """(part, offset in part) of a held span containing pos..pos+size-1."""
+        i = bisect.bisect_right(self._starts, pos) - 1
+        if i >= 0 and pos + size <= self._starts[i] + len(self._parts[i]):
+            return self._parts[i], pos - self._starts[i]
+        raise ValueError(f"Bytes {pos}-{pos + size - 1} of the archive aren't held")
+
+    def write(self, pos, data):
+        part, offset = self._locate(pos, len(data))
+        part[offset:offset + len(data)] = data
+
+    def view(self, pos, size):
+        part, offset = self._locate(pos, size)
+        return memoryview(part)[offset:offset + size]
+
+    def read_at(self, pos, b):
+        """Fill b with the bytes from pos on, to the end at most; returns the count."""
+        n = max(0, min(len(b), self.size - pos))
+        out = memoryview(b).cast("B")
+        done = 0
+        i = max(bisect.bisect_right(self._starts, pos) - 1, 0)
+        while done < n:
+            at = pos + done
+            while i < len(self._starts) and self._starts[i] + len(self._parts[i]) <= at:
+                i += 1
+            if i < len(self._starts) and self._starts[i] <= at:
+                offset = at - self._starts[i]
+                take = min(n - done, len(self._parts[i]) - offset)
+                out[done:done + take] = memoryview(self._parts[i])[offset:offset + take]
+            else:
+                gap_end = self._starts[i] if i < len(self._starts) else self.size
+                take = min(n - done, gap_end - at)
+                out[done:done + take] = bytes(take)
+            done += take
+        return n
+
+    def reader(self):
+        return MemoryFile(self)
+
+    def close(self):
+        pass
+
+
+class DiskArchive:
+    """
+    An archive downloaded into the file at path, already at its full size.
+    Writes go through one descriptor shared by every thread; reads for
+    extraction come from a read-only mmap of it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        self._mmap = mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ)
+
+    def write(self, pos, data):
+        write_at(self.fd, pos, data)
+
+    def view(self, pos, size):
+        return memoryview(self._mmap)[pos:pos + size]
+
+    def reader(self):
+        return open(self.path, "rb")
+
+    def close(self):
+        if self.fd is not None:
+            self._mmap.close()
+            os.close(self.fd)
+            self.fd = None
+
+
+class Updater:
+    """
+    Keeps version.json, talks to the GitHub API and downloads + extracts
+    archives into the script's folder. Subclasses say what the current
+    version is (latest_version) and where to get it (resolve_download_url).
+    """
+
+    REPO = None
+    # platform.system().lower() -> OS specific part of the artifact
+    OS_MAP = {}
+    # version.json key holding the installed version
+    VERSION_KEY = None
+    USER_AGENT = None
+
+    def __init__(self, script_dir):
+        # WORKING DIRECTORY = folder containing the script
+        self.script_dir = script_dir
+        self.version_file = os.path.join(script_dir, "version.json")
+
+        # One pooled session so the API, probe and range requests reuse connections
+        self.session = requests.Session()
+        if self.USER_AGENT:
+            self.session.headers["User-Agent"] = self.USER_AGENT
+
+    # -------- To be provided by subclasses --------
+    def latest_version(self):
+        raise NotImplementedError
+
+    def resolve_download_url(self):
+        raise NotImplementedError
+
+    def version_record(self, version):
+        return {self.VERSION_KEY: version}
+
+    # -------- version.json --------
+    def load_local_version(self):
+        if not os.path.exists(self.version_file):
+            return None
+        with open(self.version_file, "r") as f:
+            return json.load(f)
+
+    def save_local_version(self, version):
+        data = self.version_record(version)
+        cache = (self.load_local_version() or {}).get("http_cache")
+        if cache:
+            data["http_cache"] = cache
+        self.write_version_file(data)
+
+    def update_version_file(self, key, value):
+        """Set a single key in version.json, or remove it if value is None."""
+        data = self.load_local_version() or {}
+        if value is None:
+            data.pop(key, None)
+        else:
+            data[key] = value
+        self.write_version_file(data)
+
+    def write_version_file(self, data):
+        """
+        Replace version.json with data. It's rewritten several times a run, so
+        write a temp file and swap it in: a kill mid-write can't truncate it.
+        """
+        with tempfile.NamedTemporaryFile(
+            "w", prefix="version-", suffix=".tmp", dir=self.script_dir, delete=False
+        ) as f:
+            try:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, self.version_file)
+
+    def save_download_plan(self, plan):
+        """Store (or clear) the chunk plan of an in-progress download in version.json."""
+        self.update_version_file("pending_download", plan)
+
+    def discard_download_plan(self, plan):
+        """Delete a pending download's temp file and clear its plan."""
+        if os.path.exists(plan["path"]):
+            os.unlink(plan["path"])
+        self.save_download_plan(None)
+
+    def os_target(self):
+        sysname = platform.system().lower()
+        if sysname in self.OS_MAP:
+            return self.OS_MAP[sysname]
+        raise RuntimeError(f"Unsupported OS: {sysname}")
+
+    # -------- GitHub API --------
+    def fetch_json(self, url, keep=None):
+        """
+        GET a GitHub API URL, revalidating against the ETag / Last-Modified
+        cached in version.json. A 304 reply returns the cached body without
+        transferring it again. keep(body), if given, trims the body to the
+        fields the caller uses before it is cached and returned.
+        """
+        cache = (self.load_local_version() or {}).get("http_cache", {})
+        cached = cache.get(url)
+
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        r = self.session.get(url, headers=headers)
+        if cached and r.status_code == 304:
+            return cached["cached_body"]
+        r.raise_for_status()
+        body = r.json()
+        if keep:
+            body = keep(body)
+
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        if etag or last_modified:
+            cache[url] = {"etag": etag, "last_modified": last_modified, "cached_body": body}
+            self.update_version_file("http_cache", cache)
+        return body
+
+    # -------- Download --------
+    def probe_download(self, url):
+        """Return (final_url, size), size is None if byte ranges aren't supported."""
+        r = self.session.head(url, allow_redirects=True)
+        size = int(r.headers.get("Content-Length") or 0)
+        if not r.ok or r.headers.get("Accept-Ranges", "").lower() != "bytes" or size <= 0:
+            return url, None
+        return r.url, size
+
+    def read_range(self, url, lo, hi):
+        """Fetch bytes lo..hi of url, yielding them in pieces of up to CHUNK_SIZE."""
+        with self.session.get(url, headers={"Range": f"bytes={lo}-{hi}"}, stream=True) as r:
+            r.raise_for_status()
+            if r.status_code != 206:
+                raise RuntimeError(f"Server ignored range request for bytes {lo}-{hi}")
+            # Read urllib3's stream directly, skipping iter_content's generator
+            r.raw.decode_content = True
+            while chunk := r.raw.read(CHUNK_SIZE):
+                yield chunk
+
+    def temp_archive(self):
+        """A new, closed temp file next to the script; the caller unlinks it."""
+        with tempfile.NamedTemporaryFile(
+            prefix="download-", suffix=".zip", dir=self.script_dir, delete=False
+        ) as f:
+            return f.name
+
+    def stream_download(self, url):
+        """
+        Download url in a single stream. Returns the bytes in a bytearray when
+        the server announces a size up to SPOOL_MAX, otherwise the path of a
+        temp file holding them.
+        """
+        with self.session.get(url, stream=True) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            size = int(r.headers.get("Content-Length") or 0)
+            if 0 < size <= SPOOL_MAX:
+                buf = bytearray()
+                while chunk := r.raw.read(CHUNK_SIZE):
+                    buf += chunk
+                return buf
+            dest = self.temp_archive()
+            try:
+                with open(dest, "wb") as f:
+                    if size:
+                        preallocate(f, size)
+                    shutil.copyfileobj(r.raw, f, CHUNK_SIZE)
+            except BaseException:
+                os.unlink(dest)
+                raise
+        return dest
+
+    def download_and_extract(self, url, version=None, nchunks=PARALLEL_CHUNKS):
+        """
+        Download url, the archive of version, over nchunks concurrent Range
+        requests and extract it into the script folder while it downloads.
+        The central directory is fetched first; only members that differ from
+        the files on disk are then downloaded, each extracted as soon as its
+        chunk has arrived.
+        Archives up to SPOOL_MAX bytes are assembled in memory, larger ones in
+        a temp file that is removed once extracted; its chunk plan is kept in
+        version.json so an interrupted download of the same version resumes.
+        Without range support the archive is downloaded first, then extracted.
+        """
+        final_url, size = self.probe_download(url)
+
+        # Only an on-disk Range download of this same archive can resume; drop
+        # any other plan here, whichever path this download takes. Nightly
+        # URLs don't change between builds, so match the version too
+        plan = (self.load_local_version() or {}).get("pending_download")
+        if plan and not (
+            size is not None and size > SPOOL_MAX
+            and plan["url"] == url and plan["size"] == size and plan.get("version") == version
+            and os.path.exists(plan["path"])
+        ):
+            self.discard_download_plan(plan)
+            plan = None
+
+        if size is None:
+            archive = self.stream_download(url)
+            try:
+                self.extract_zip(archive)
+            finally:
+                if isinstance(archive, str):
+                    os.unlink(archive)
+            return
+
+        if size <= SPOOL_MAX:
+            # Nothing to resume in memory, so the plan is never saved
+            plan = {"chunks": []}
+        else:
+            if plan:
+                print("Resuming interrupted download...")
+            else:
+                plan = {"url": url, "version": version, "size": size,
+                        "path": self.temp_archive(), "chunks": []}
+                try:
+                    with open(plan["path"], "r+b") as f:
+                        preallocate(f, size)
+                except BaseException:
+                    os.unlink(plan["path"])
+                    raise
+                # Saved before anything is fetched, so whatever fails next, the
+                # next run finds the temp file and resumes or removes it
+                self.save_download_plan(plan)
+
+        corrupt = False
+        try:
+            self.ranged_extract(final_url, size, plan, nchunks)
+        except zipfile.BadZipFile:
+            # Bad data in finished chunks would fail every resume the same way
+            corrupt = True
+            raise
+        finally:
+            if corrupt and "path" in plan:
+                self.discard_download_plan(plan)
+
+        if "path" in plan:
+            os.unlink(plan["path"])
+            self.save_download_plan(None)
+        print("Extraction complete.")
+
+    def ranged_extract(self, url, size, plan, nchunks):
+        """
+        Fetch the central directory of the size-byte zip at url, add chunks
+        for the members that changed to plan and download and extract them:
+        into plan's temp file if it has a path, otherwise into memory, where
+        only the planned chunks and the tail are held.
+        """
+        tail_start, tail, cd_start = self.fetch_central_directory(url, size)
+        index = MemoryArchive(size, [(tail_start, size - 1)])
+        index.write(tail_start, tail)
+        with zipfile.ZipFile(index.reader()) as zf:
+            files = sorted(self.prepare_members(zf), key=lambda info: info.header_offset)
+        ends = self.member_ends(files, cd_start)
+        changed = self.changed_members(files)
+        if not changed:
+            print(f"All {len(files)} files already match, nothing to download.")
+        else:
+            print(f"Extracting {len(changed)} of {len(files)} files as they download ...")
+
+        self.extend_plan(plan, changed, ends, nchunks)
+        if "path" in plan:
+            self.save_download_plan(plan)
+            store = DiskArchive(plan["path"])
+        else:
+            store = MemoryArchive(size, [(lo, hi) for lo, hi, _ in plan["chunks"]] + [(tail_start, size - 1)])
+        open_zip, close_all = self.zip_opener(store)
+        try:
+            store.write(tail_start, tail)
+            owned, straddling = self.assign_members(plan["chunks"], changed, ends)
+            self.download_members(url, store, plan, owned, straddling, open_zip, nchunks)
+        finally:
+            close_all()
+            store.close()
+
+    def fetch_central_directory(self, url, size):
+        """
+        Fetch the end of the zip at url: the last TAIL_SIZE bytes, and more if
+        the central directory starts before them. Returns (start, data,
+        central directory offset).
+        """
+        tail_start = max(0, size - TAIL_SIZE)
+        tail = b"".join(self.read_range(url, tail_start, size - 1))
+        cd_start = central_directory_offset(tail, tail_start)
+        if cd_start < tail_start:
+            tail = b"".join(self.read_range(url, cd_start, tail_start - 1)) + tail
+            tail_start = cd_start
+        return tail_start, tail, cd_start
+
+    def member_ends(self, files, cd_start):
+        """Map each member's header offset to where its data ends: the next header."""
+        offsets = [info.header_offset for info in files]
+        return dict(zip(offsets, offsets[1:] + [cd_start]))
+
+    def extend_plan(self, plan, changed, ends, nchunks):
+        """
+        Add chunks to plan for the changed members its chunks don't cover yet;
+        a resumed plan already covers those it was made for.
+        """
+        starts = [c[0] for c in plan["chunks"]]
+        missing = []
+        for info in changed:
+            i = bisect.bisect_right(starts, info.header_offset) - 1
+            if i < 0 or plan["chunks"][i][1] < info.header_offset:
+                missing.append((info.header_offset, ends[info.header_offset]))
+        if missing:
+            plan["chunks"] = sorted(plan["chunks"] + self.plan_chunks(missing, nchunks))
+
+    def assign_members(self, chunks, changed, ends):
+        """
+        Return (owned, straddling). owned[i] lists the (info, end) pairs of the
+        members lying wholly inside chunks[i], by offset: each is ready once
+        chunk i has been written up to end. The straddling ones span two
+        chunks and wait for the whole download.
+        """
+        starts = [c[0] for c in chunks]
+        owned = [[] for _ in chunks]
+        straddling = []
+        for info in changed:
+            end = ends[info.header_offset]
+            i = bisect.bisect_right(starts, info.header_offset) - 1
+            if end <= chunks[i][1] + 1:
+                owned[i].append((info, end))
+            else:
+                straddling.append(info)
+        return owned, straddling
+
+    def download_members(self, url, store, plan, owned, straddling, open_zip, nchunks):
+        """
+        Download plan's unfinished chunks over nchunks connections into store,
+        extracting each owned member as soon as its bytes are in, then the
+        straddling ones. Finished chunks are marked done; a resumable plan
+        (one with a path) is saved after each.
+        """
+        lock = threading.Lock()
+        extracts = []
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as extractors:
+
+            def extract(info):
+                extracts.append(extractors.submit(self.extract_member, open_zip, info, store))
+
+            def fetch(i):
+                chunk = plan["chunks"][i]
+                self.fetch_chunk(url, store, chunk, owned[i], extract)
+                with lock:
+                    chunk[2] = True
+                    if "path" in plan:
+                        self.save_download_plan(plan)
+
+            for i, chunk in enumerate(plan["chunks"]):
+                if chunk[2]:
+                    for info, _ in owned[i]:
+                        extract(info)
+
+            pending = [i for i, chunk in enumerate(plan["chunks"]) if not chunk[2]]
+            with ThreadPoolExecutor(max_workers=nchunks) as downloads:
+                list(downloads.map(fetch, pending))
+
+            for info in straddling:
+                extract(info)
+            for future in extracts:
+                future.result()
+
+    def fetch_chunk(self, url, store, chunk, members, extract):
+        """
+        Download one [lo, hi, done] chunk of url into store, calling
+        extract(info) for each of its members, (info, end) pairs in offset
+        order, once the chunk has been written up to end.
+        """
+        pos = chunk[0]
+        ready = 0
+        for data in self.read_range(url, chunk[0], chunk[1]):
+            store.write(pos, data)
+            pos += len(data)
+            while ready < len(members) and members[ready][1] <= pos:
+                extract(members[ready][0])
+                ready += 1
+
+    def plan_chunks(self, spans, nchunks):
+        """
+        Turn sorted (start, end) byte spans into [lo, hi, done] chunks: spans
+        closer than RANGE_GAP are merged, since the gap costs less than
+        another request, and long spans are split so the download still runs
+        over about nchunks connections, but never into pieces smaller than
+        RANGE_GAP.
+        """
+        merged = []
+        for lo, hi in spans:
+            if merged and lo - merged[-1][1] <= RANGE_GAP:
+                merged[-1][1] = hi
+            else:
+                merged.append([lo, hi])
+        step = max(-(-sum(hi - lo for lo, hi in merged) // nchunks), RANGE_GAP)
+        chunks = []
+        for lo, hi in merged:
+            chunks.extend([start, min(start + step, hi) - 1, False] for start in range(lo, hi, step))
+        return chunks
+
+    # -------- Extract --------
+    def member_path(self, info):
+        """
+        Where ZipFile.extract puts a member: drive, '.' and '..' parts dropped,
+        and on Windows characters it can't store replaced by '_' and trailing
+        dots stripped.
+        """
+        name = info.filename.replace("/", os.path.sep)
+        if os.path.altsep:
+            name = name.replace(os.path.altsep, os.path.sep)
+        name = os.path.splitdrive(name)[1]
+        parts = [p for p in name.split(os.path.sep) if p not in ("", os.curdir, os.pardir)]
+        if os.path.sep == "\\":
+            parts = [p.translate(WINDOWS_ILLEGAL).rstrip(".") for p in parts]
+            parts = [p for p in parts if p]
+        return os.path.join(self.script_dir, *parts)
+
+    def zip_opener(self, store):
+        """
+        Return (open_zip, close_all) for a MemoryArchive or DiskArchive.
+        open_zip() gives each thread its own ZipFile so reads don't serialize
+        on a shared handle.
+        """
+        local = threading.local()
+        handles = []
+
+        def open_zip():
+            if not hasattr(local, "zf"):
+                fp = store.reader()
+                local.zf = zipfile.ZipFile(fp, "r")
+                handles.append((local.zf, fp))
+            return local.zf
+
+        def close_all():
+            for zf, fp in handles:
+                zf.close()
+                fp.close()
+
+        return open_zip, close_all
+
+    def extract_member(self, open_zip, info, store):
+        """
+        Write one file member of store's archive to disk; open_zip is from
+        zip_opener(store). Compressed members are inflated in CHUNK_SIZE
+        pieces; stored ones skip zipfile and are checksummed and written
+        straight from a view of the archive's bytes.
+        """
+        path = self.member_path(info)
+        if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+            with open_zip().open(info) as src, open(path, "wb") as out:
+                shutil.copyfileobj(src, out, CHUNK_SIZE)
+        else:
+            # Data follows the local header: 30 bytes, then name and extra field
+            with store.view(info.header_offset + 26, 4) as lengths:
+                name_len, extra_len = struct.unpack("<HH", lengths)
+            start = info.header_offset + 30 + name_len + extra_len
+            with store.view(start, info.file_size) as data, open(path, "wb") as out:
+                if zipfile.crc32(data) != info.CRC:
+                    raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+                out.write(data)
+        self.stamp(path, info)
+
+    def member_mtime(self, info):
+        """info.date_time (local time, as zip stores it) in epoch seconds."""
+        try:
+            return int(time.mktime(info.date_time + (0, 0, -1)))
+        except (OverflowError, ValueError):
+            return None
+
+    def stamp(self, path, info):
+        """Give an extracted file its member's mtime, for is_unchanged's stat check."""
+        mtime = self.member_mtime(info)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def prepare_members(self, zf):
+        """Create every directory in zf up front and return its file members."""
+        infos = zf.infolist()
+        # Done serially so extract workers never race on makedirs
+        for info in infos:
+            target = self.member_path(info)
+            os.makedirs(target if info.is_dir() else os.path.dirname(target), exist_ok=True)
+        return [info for info in infos if not info.is_dir()]
+
+    def is_unchanged(self, info):
+        """
+        True if the member's file on disk already has its contents. A matching
+        size and mtime (set when it was extracted) is trusted as is; otherwise
+        the file's CRC is compared.
+        """
+        path = self.member_path(info)
+        try:
+            st = os.stat(path)
+            if st.st_size != info.file_size:
+                return False
+            if int(st.st_mtime) == self.member_mtime(info):
+                return True
+            crc = 0
+            with open(path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    crc = zipfile.crc32(chunk, crc)
+            if crc != info.CRC:
+                return False
+            # Same contents, e.g. extracted before mtimes were kept; skip the
+            # CRC next time
+            self.stamp(path, info)
+        except OSError:
+            return False
+        return True
+
+    def changed_members(self, files):
+        """The members of files that differ from what is on disk, in order."""
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            unchanged = list(ex.map(self.is_unchanged, files))
+        return [info for info, same in zip(files, unchanged) if not same]
+
+    def extract_zip(self, archive):
+        """Extract a zip, given as a path or a bytearray, into the script folder."""
+        print(f"Extracting {archive if isinstance(archive, str) else 'downloaded archive'} ...")
+        store = DiskArchive(archive) if isinstance(archive, str) else MemoryArchive.of(archive)
+        open_zip, close_all = self.zip_opener(store)
+        try:
+            files = self.changed_members(self.prepare_members(open_zip()))
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+                list(ex.map(lambda info: self.extract_member(open_zip, info, store), files))
+        finally:
+            close_all()
+            store.close()
+        print("Extraction complete.")
+
+    # -------- Main logic --------
+    def run(self):
+        local = self.load_local_version()
+        installed = local.get(self.VERSION_KEY) if local else None
+
+        if installed:
+            print(f"Installed version: {installed}")
+        else:
+            print("No version.json found — fresh install.")
+
+        # last_checked is only written once a check has ended up-to-date, so
+        # a failed download is retried right away. Never skip a pending one.
+        last_checked = local.get("last_checked") if local else None
+        if installed and last_checked and "pending_download" not in local:
+            age = time.time() - last_checked
+            if 0 <= age < CHECK_INTERVAL_SEC:
+                print(f"Last checked {int(age)}s ago, skipping (HM64_CHECK_INTERVAL={CHECK_INTERVAL_SEC}).")
+                return
+
+        latest = self.latest_version()
+        print(f"Latest version online: {latest}")
+
+        if installed == latest:
+            self.update_version_file("last_checked", time.time())
+            print("Already up-to-date.")
+            return
+
+        url = self.resolve_download_url()
+        print(f"Downloading: {url}")
+        self.download_and_extract(url, latest)
+
+        self.save_local_version(latest)
+        self.update_version_file("last_checked", time.time())
+        print("version.json updated.")
+        print(f"Updated to {latest}")
+
+
+class ReleaseUpdater(Updater):
+    """Installs the matching zip asset of the repo's latest GitHub release."""
+
+    VERSION_KEY = "installed_version"
+    # Also consider pre-releases, not just the release marked "latest"
+    INCLUDE_PRERELEASES = False
+
+    def version_record(self, version):
+        return {"installed_version": version, "repo": self.REPO}
+
+    @staticmethod
+    def release_fields(release):
+        """The parts of a release object used here; the rest isn't cached."""
+        return {
+            "tag_name": release["tag_name"],
+            "assets": [
+                {"name": a["name"], "browser_download_url": a["browser_download_url"]}
+                for a in release["assets"]
+            ],
+        }
+
+    def get_latest_release(self):
+        if not self.INCLUDE_PRERELEASES:
+            return self.fetch_json(
+                f"https://api.github.com/repos/{self.REPO}/releases/latest", self.release_fields
+            )
+
+        releases = self.fetch_json(
+            f"https://api.github.com/repos/{self.REPO}/releases",
+            lambda releases: [self.release_fields(r) for r in releases[:1]],
+        )
+        if not releases:
+            raise RuntimeError("No releases or pre-releases found.")
+        return releases[0]  # GitHub sorts newest → oldest
+
+    def latest_version(self):
+        self.release = self.get_latest_release()
+        return self.release["tag_name"]
+
+    def asset_matcher(self, target):
+        """Predicate on lowercased asset names, built once per lookup."""
+        # SoH pattern: end with -<OS>.zip
+        suffix = f"-{target}.zip"
+        return lambda name: name.endswith(suffix)
+
+    def resolve_download_url(self):
+        target = self.os_target().lower()
+        matches = self.asset_matcher(target)
+
+        # First match wins; stop scanning there
+        asset = next((a for a in self.release["assets"] if matches(a["name"].lower())), None)
+        if asset is None:
+            raise RuntimeError(f"No matching asset for OS '{target}'")
+
+        print(f"Selected asset: {asset['name']}")
+        return asset["browser_download_url"]
+
+
+class NightlyUpdater(Updater):
+    """Installs the nightly.link artifact built from the latest commit of BRANCH."""
+
+    VERSION_KEY = "latest_commit"
+    WORKFLOW = None
+    BRANCH = None
+
+    @property
+    def nightly_base(self):
+        return f"https://nightly.link/{self.REPO}/workflows/{self.WORKFLOW}/{self.BRANCH}"
+
+    def latest_version(self):
+        """Get the latest commit SHA from the branch on GitHub"""
+        data = self.fetch_json(
+            f"https://api.github.com/repos/{self.REPO}/commits/{self.BRANCH}",
+            lambda commit: {"sha": commit["sha"]},
+        )
+        return data["sha"]
+
+    def resolve_download_url(self):
+        return f"{self.nightly_base}/{self.os_target()}"
+
+
+class PullRequestUpdater(Updater):
+    """
+    Installs the artifact linked from a PR: reads the PR description for
+    markdown links first and falls back to scraping the PR page. The
+    download URL itself is the version.
+    """
+
+    VERSION_KEY = "download_url"
+    PR_NUMBER = None
+    # Compiled patterns with groups (artifact name, url), for the PR body
+    # (markdown links) and the PR page (HTML)
+    MD_LINK_RE = None
+    HTML_LINK_RE = None
+
+    def version_record(self, version):
+        return {"download_url": version, "repo": self.REPO, "pr_number": self.PR_NUMBER}
+
+    def fetch_pr_body(self):
+        data = self.fetch_json(
+            f"https://api.github.com/repos/{self.REPO}/pulls/{self.PR_NUMBER}",
+            lambda pr: {"body": pr.get("body")},
+        )
+        return data.get("body") or ""
+
+    def fetch_pr_html(self):
+        r = self.session.get(f"https://github.com/{self.REPO}/pull/{self.PR_NUMBER}")
+        r.raise_for_status()
+        return r.text
+
+    def extract_links(self, pattern, text):
+        """Returns dict: { "<artifact>.zip": "https://..." }"""
+        links = {}
+        for m in pattern.finditer(text):
+            links[m.group(1).strip().lower()] = m.group(2).strip()
+        return links
+
+    def latest_version(self):
+        target = self.os_target().lower()
+
+        # Fetch the PR page alongside the description, so falling back to it
+        # doesn't cost a second round-trip
+        print(f"Fetching PR #{self.PR_NUMBER} description via API...")
+        ex = ThreadPoolExecutor(max_workers=2)
+        try:
+            body_future = ex.submit(self.fetch_pr_body)
+            html_future = ex.submit(self.fetch_pr_html)
+
+            # 1) Try PR body first
+            try:
+                body = body_future.result()
+            except Exception as e:
+                print(f"Warning: failed to fetch PR body via API: {e}")
+                body = ""
+
+            links = {}
+            if body:
+                links = self.extract_links(self.MD_LINK_RE, body)
+                if links:
+                    print("Found artifact links in PR body (markdown links).")
+            else:
+                print("PR body empty or unavailable.")
+
+            # 2) Fallback: scrape PR HTML if no links found in body
+            if not links:
+                print("Falling back to scraping PR HTML for artifact links...")
+                try:
+                    links = self.extract_links(self.HTML_LINK_RE, html_future.result())
+                    if links:
+                        print("Found artifact links in PR HTML.")
+                except Exception as e:
+                    print(f"Failed to fetch/scrape PR HTML: {e}")
+        finally:
+            # Don't hold up the update on a page fetch that's no longer needed
+            ex.shutdown(wait=False)
+
+        if not links:
+            raise RuntimeError("No artifact links found in PR body or HTML.")
+
+        if target not in links:
+            available = ", ".join(sorted(links.keys()))
+            raise RuntimeError(f"Artifact for this OS ('{target}') not found. Available links: {available}")
+
+        self.download_url = links[target]
+        print(f"Selected artifact: {target} -> {self.download_url}")
+        return self.download_url
+
+    def resolve_download_url(self):
+        # nightly.link serves the artifact as a plain zip
+        return self.download_url